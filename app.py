@@ -3,24 +3,25 @@
 A comprehensive financial assistant with stock prices, Bitcoin tracking, and web scraping.
 """
 
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+
+import requests
 import streamlit as st
 from financial_assistant_backend import (
+    BitcoinPriceStream,
     FinancialAssistant,
+    build_http2_client,
+    build_http_session,
     format_stock_response,
     format_bitcoin_response,
     format_scraped_response
 )
 
-# Page configuration
-st.set_page_config(
-    page_title="Financial Assistant",
-    page_icon="💰",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -44,27 +45,274 @@ st.markdown("""
         font-size: 1.1rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+# Page configuration
+st.set_page_config(
+    page_title="Financial Assistant",
+    page_icon="💰",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+
+# Custom CSS, injected once and replayed from the cache on later reruns
+@st.cache_resource
+def _inject_css():
+    """Inject the app's custom CSS."""
+    st.markdown(_CSS, unsafe_allow_html=True)
+    return True
+
+
+_inject_css()
+
+
+# Chat messages kept verbatim; older ones are folded into a list of earlier questions
+MAX_TURNS = 20
+SUMMARY_BATCH = 10
+CHAT_DB_PATH = "chat.db"
+
+# Chats with no new message for this long are deleted when the app starts
+CHAT_RETENTION_DAYS = 30
 
+# Identical chat submits closer together than this are ignored
+DEBOUNCE_SECONDS = 2.0
+
+# How often the live Bitcoin widget re-renders
+BTC_REFRESH_SECONDS = 2
+
+# Quick-access tickers and widget copy
+POPULAR_STOCKS = ("AAPL", "TSLA", "GOOGL", "MSFT", "AMZN", "META", "NVDA", "AMD")
+API_KEY_HELP = "Required for web scraping and smart query analysis"
+TICKER_PLACEHOLDER = "e.g., AAPL, TSLA, GOOGL"
+URL_PLACEHOLDER = "https://example.com/financial-news"
+QUERY_PLACEHOLDER = "e.g., Tesla earnings report, Apple product launch, Market trends"
+CHAT_PLACEHOLDER = "Ask me anything about stocks, Bitcoin, or financial news..."
+UNKNOWN_INTENT_HINT = (
+    "I'm not sure what you're asking for. Please try:",
+    "- 'AAPL stock price'",
+    "- 'Bitcoin value'",
+    "- 'Scrape [URL] for [query]'",
+)
+
+# Chat replies are stored as typed parts and joined with this when displayed
+PART_SEPARATOR = "\n\n---\n\n"
 
 # Initialize session state
 if 'assistant' not in st.session_state:
     st.session_state.assistant = None
 
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+# The chat id lives in the URL, so reloading or reopening the link resumes the chat
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = st.query_params.get("sid") or uuid.uuid4().hex
+    st.query_params["sid"] = st.session_state.session_id
+
+if 'history_summary' not in st.session_state:
+    st.session_state.history_summary = ""
+    st.session_state.history_summarized = 0
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Build the pooled keep-alive HTTP session shared by all assistants."""
+    return build_http_session()
+
+
+@st.cache_resource
+def get_api_client():
+    """Build the client shared by all assistants for the price APIs.
+
+    This is an HTTP/2 client when httpx[http2] is installed, otherwise the
+    pooled HTTP session.
+    """
+    return build_http2_client() or get_http_session()
+
+
+@st.cache_resource
+def get_assistant(api_key: str):
+    """Build one assistant per API key and share it across sessions."""
+    return FinancialAssistant(
+        google_api_key=api_key, http_session=get_http_session(), api_client=get_api_client()
+    )
 
 
 def initialize_assistant(api_key: str = None):
     """Initialize the financial assistant."""
     try:
-        st.session_state.assistant = FinancialAssistant(google_api_key=api_key)
+        st.session_state.assistant = get_assistant(api_key or "")
         return True
     except Exception as e:
         st.error(f"Failed to initialize assistant: {e}")
         return False
 
 
+@st.cache_resource
+def get_btc_stream():
+    """Start the live Bitcoin price stream once per process."""
+    stream = BitcoinPriceStream()
+    stream.start()
+    return stream
+
+
+def ensure_assistant(api_key: str = None):
+    """Initialize the assistant, or switch it when a different key is entered."""
+    assistant = st.session_state.assistant
+    stale = assistant is None or (api_key and api_key != assistant.settings.api_key)
+    if stale and not initialize_assistant(api_key or None):
+        st.stop()
+
+
+@st.cache_resource
+def get_chat_db() -> sqlite3.Connection:
+    """Open the chat history database once per process, pruning abandoned chats."""
+    conn = sqlite3.connect(CHAT_DB_PATH, check_same_thread=False)
+    conn.execute("CREATE TABLE IF NOT EXISTS messages (session_id TEXT, ts REAL, role TEXT, content TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS messages_session_ts ON messages (session_id, ts)")
+    conn.execute(
+        "DELETE FROM messages WHERE session_id IN "
+        "(SELECT session_id FROM messages GROUP BY session_id HAVING MAX(ts) < ?)",
+        (time.time() - CHAT_RETENTION_DAYS * 86400,)
+    )
+    conn.commit()
+    return conn
+
+
+def save_message(role: str, parts: list):
+    """Store a chat message's parts for the current session."""
+    conn = get_chat_db()
+    with conn:
+        conn.execute(
+            "INSERT INTO messages (session_id, ts, role, content) VALUES (?, ?, ?, ?)",
+            (st.session_state.session_id, time.time(), role, json.dumps(parts))
+        )
+
+
+def _decode_parts(content: str) -> list:
+    """Decode stored message parts; older rows hold plain markdown."""
+    try:
+        parts = json.loads(content)
+    except ValueError:
+        parts = None
+    return parts if isinstance(parts, list) else [{"type": "text", "data": content}]
+
+
+def count_messages() -> int:
+    """Count the stored chat messages for the current session."""
+    row = get_chat_db().execute(
+        "SELECT COUNT(*) FROM messages WHERE session_id = ?",
+        (st.session_state.session_id,)
+    ).fetchone()
+    return row[0]
+
+
+def load_recent_messages(limit: int = MAX_TURNS):
+    """Load the latest chat messages for the current session, oldest first."""
+    rows = get_chat_db().execute(
+        "SELECT role, content FROM messages WHERE session_id = ? ORDER BY ts DESC, rowid DESC LIMIT ?",
+        (st.session_state.session_id, limit)
+    ).fetchall()
+    return [{"role": role, "parts": _decode_parts(content)} for role, content in reversed(rows)]
+
+
+def load_messages(offset: int, limit: int):
+    """Load a slice of the current session's chat messages in chronological order."""
+    rows = get_chat_db().execute(
+        "SELECT role, content FROM messages WHERE session_id = ? ORDER BY ts, rowid LIMIT ? OFFSET ?",
+        (st.session_state.session_id, limit, offset)
+    ).fetchall()
+    return [{"role": role, "parts": _decode_parts(content)} for role, content in rows]
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fmt_stock(data: dict) -> str:
+    """Format stock data, memoized on the data itself."""
+    return format_stock_response(data)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fmt_btc(data: dict) -> str:
+    """Format Bitcoin data, memoized on the data itself."""
+    return format_bitcoin_response(data)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fmt_scraped(data: dict) -> str:
+    """Format a scrape result, memoized on the data itself."""
+    return format_scraped_response(data)
+
+
+def render_part(part: dict) -> str:
+    """Format one stored message part as markdown."""
+    kind, data = part["type"], part["data"]
+    if kind == "stock":
+        return _fmt_stock(data)
+    if kind == "bitcoin":
+        return _fmt_btc(data)
+    if kind == "scraped":
+        return _fmt_scraped(data)
+    return data
+
+
+def render_parts(parts: list) -> str:
+    """Format a message's parts as one markdown reply."""
+    return PART_SEPARATOR.join(render_part(part) for part in parts)
+
+
+def summarize_history(messages: list, previous_summary: str = "") -> str:
+    """Fold older chat messages into the list of questions that were asked."""
+    lines = [previous_summary] if previous_summary else []
+    lines += [f"- {render_parts(m['parts'])}" for m in messages if m["role"] == "user"]
+    return "\n".join(lines)
+
+
+def is_repeat_submit(user_input: str) -> bool:
+    """Check whether the same input was already submitted within DEBOUNCE_SECONDS."""
+    input_hash = hashlib.sha256(user_input.encode()).hexdigest()
+    now = time.time()
+
+    repeat = (
+        input_hash == st.session_state.get('_last_input_hash')
+        and now - st.session_state.get('_last_ts', 0.0) < DEBOUNCE_SECONDS
+    )
+
+    st.session_state._last_input_hash = input_hash
+    st.session_state._last_ts = now
+    return repeat
+
+
+def refresh_popular_stock(ticker: str):
+    """Re-fetch one Popular Stocks tile, bypassing the backend price cache."""
+    st.session_state.popular_cache[ticker] = st.session_state.assistant.fetch_stock_price(ticker, refresh=True)
+
+
+def refresh_popular_stocks():
+    """Re-fetch every Popular Stocks tile, bypassing the backend price cache."""
+    st.session_state.popular_cache = st.session_state.assistant.fetch_stock_prices(
+        list(POPULAR_STOCKS), refresh=True
+    )
+
+
+def stream_response(query: str, parts: list):
+    """Yield the formatted reply part by part, collecting the raw parts into `parts`."""
+    for kind, data in st.session_state.assistant.iter_query(query):
+        # Keep what was found as data; it is formatted again on every display
+        new_parts = []
+        if kind == 'analysis':
+            if data.get('intent', 'unknown') == 'unknown':
+                new_parts = [{"type": "text", "data": line} for line in UNKNOWN_INTENT_HINT]
+        elif kind == 'stock_data':
+            new_parts = [{"type": "stock", "data": data}]
+        elif kind == 'bitcoin_data':
+            new_parts = [{"type": "bitcoin", "data": data}]
+        elif kind == 'scraped_data':
+            new_parts = [{"type": "scraped", "data": data}]
+
+        for part in new_parts:
+            yield (PART_SEPARATOR if parts else "") + render_part(part)
+            parts.append(part)
+
+
 # Sidebar for configuration
 with st.sidebar:
     st.title("⚙️ Configuration")
@@ -72,7 +320,7 @@ with st.sidebar:
     api_key = st.text_input(
         "Google API Key (Gemini)",
         type="password",
-        help="Required for web scraping and smart query analysis"
+        help=API_KEY_HELP
     )
 
     if st.button("💾 Save API Key"):
@@ -104,6 +352,10 @@ with st.sidebar:
     st.code("Scrape https://news.com for Tesla news", language="text")
 
 
+# Single initialization path for every tab
+ensure_assistant(api_key)
+
+
 # Main content
 st.markdown('<div class="main-header">💰 Financial Assistant</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-header">Stock Prices • Bitcoin • Web Scraping • AI-Powered</div>', unsafe_allow_html=True)
@@ -113,7 +365,20 @@ tab1, tab2, tab3 = st.tabs(["📊 Quick Prices", "🔍 Web Scraper", "🤖 Smart
 
 
 # TAB 1: Quick Prices
-with tab1:
+@st.fragment(run_every=BTC_REFRESH_SECONDS)
+def render_live_btc():
+    """Show the latest streamed Bitcoin price, re-rendered on a timer."""
+    btc_data = get_btc_stream().latest()
+    if btc_data is None:
+        # Stream not connected (yet), use the REST endpoint; the backend
+        # caches prices, and holds failures briefly so ticks don't hammer it
+        btc_data = st.session_state.assistant.fetch_bitcoin_price()
+    st.markdown(_fmt_btc(btc_data))
+
+
+@st.fragment
+def render_quick_prices():
+    """Render the Quick Prices tab."""
     st.header("📊 Quick Price Lookup")
     st.markdown("Get instant stock and Bitcoin prices without any API key!")
 
@@ -123,68 +388,71 @@ with tab1:
         st.subheader("📈 Stock Price")
         ticker = st.text_input(
             "Enter Stock Ticker",
-            placeholder="e.g., AAPL, TSLA, GOOGL",
+            placeholder=TICKER_PLACEHOLDER,
             key="stock_ticker"
         )
 
         if st.button("Get Stock Price", key="fetch_stock"):
             if ticker:
                 with st.spinner(f"Fetching {ticker} price..."):
-                    if st.session_state.assistant is None:
-                        initialize_assistant()
-
                     stock_data = st.session_state.assistant.fetch_stock_price(ticker.upper())
-                    st.markdown(format_stock_response(stock_data))
+                    st.markdown(_fmt_stock(stock_data))
             else:
                 st.warning("Please enter a stock ticker")
 
     with col2:
         st.subheader("₿ Bitcoin Price")
-        st.markdown("Get the latest Bitcoin price from Coinlore")
-
-        if st.button("Get Bitcoin Price", key="fetch_btc"):
-            with st.spinner("Fetching Bitcoin price..."):
-                if st.session_state.assistant is None:
-                    initialize_assistant()
+        st.markdown("Live Bitcoin price from Binance, with Coinlore as fallback")
 
-                btc_data = st.session_state.assistant.fetch_bitcoin_price()
-                st.markdown(format_bitcoin_response(btc_data))
+        render_live_btc()
 
     st.divider()
 
     # Popular stocks quick access
     st.subheader("🔥 Popular Stocks")
-    popular_stocks = ["AAPL", "TSLA", "GOOGL", "MSFT", "AMZN", "META", "NVDA", "AMD"]
+
+    # Pre-fetch all popular tickers in one batch, once per session
+    if 'popular_cache' not in st.session_state:
+        with st.spinner("Fetching popular stocks..."):
+            st.session_state.popular_cache = st.session_state.assistant.fetch_stock_prices(list(POPULAR_STOCKS))
+
+    st.button("🔄 Refresh", key="refresh_popular", on_click=refresh_popular_stocks)
 
     cols = st.columns(4)
-    for idx, stock in enumerate(popular_stocks):
+    for idx, stock in enumerate(POPULAR_STOCKS):
         with cols[idx % 4]:
-            if st.button(stock, key=f"quick_{stock}"):
-                with st.spinner(f"Fetching {stock}..."):
-                    if st.session_state.assistant is None:
-                        initialize_assistant()
+            stock_data = st.session_state.popular_cache[stock]
+            if "error" in stock_data:
+                st.metric(stock, "N/A")
+            else:
+                st.metric(stock, f"${stock_data['current_price']}", f"{stock_data['change_percent']:+.2f}%")
+
+            st.button(f"↻ {stock}", key=f"quick_{stock}", on_click=refresh_popular_stock, args=(stock,))
+
 
-                    stock_data = st.session_state.assistant.fetch_stock_price(stock)
-                    st.markdown(format_stock_response(stock_data))
+with tab1:
+    render_quick_prices()
 
 
 # TAB 2: Web Scraper
-with tab2:
+@st.fragment
+def render_scraper():
+    """Render the Web Scraper tab."""
     st.header("🔍 Intelligent Web Scraper")
     st.markdown("Scrape websites for specific financial information using AI")
 
-    if not api_key and st.session_state.assistant is None:
+    if not st.session_state.assistant.settings.api_key:
         st.warning("⚠️ Please configure your Google API Key in the sidebar to use web scraping")
 
     url_input = st.text_input(
         "Website URL",
-        placeholder="https://example.com/financial-news",
+        placeholder=URL_PLACEHOLDER,
         key="scrape_url"
     )
 
     query_input = st.text_area(
         "What are you looking for?",
-        placeholder="e.g., Tesla earnings report, Apple product launch, Market trends",
+        placeholder=QUERY_PLACEHOLDER,
         key="scrape_query",
         height=100
     )
@@ -195,7 +463,7 @@ with tab2:
         if st.button("🚀 Scrape Website", key="scrape_btn", use_container_width=True):
             if not url_input or not query_input:
                 st.error("Please provide both URL and search query")
-            elif st.session_state.assistant is None:
+            elif not st.session_state.assistant.settings.api_key:
                 st.error("Please configure your API key first")
             else:
                 with st.spinner(f"Scraping {url_input}..."):
@@ -203,7 +471,7 @@ with tab2:
 
                     st.divider()
                     st.subheader("📄 Scraping Results")
-                    st.markdown(format_scraped_response(scraped_data))
+                    st.markdown(_fmt_scraped(scraped_data))
 
     with col2:
         if st.button("🗑️ Clear", key="clear_scraper"):
@@ -228,8 +496,14 @@ with tab2:
         """)
 
 
+with tab2:
+    render_scraper()
+
+
 # TAB 3: Smart Assistant (Chat Mode)
-with tab3:
+@st.fragment
+def render_chat():
+    """Render the Smart Assistant chat tab."""
     st.header("🤖 Smart Assistant")
     st.markdown("Ask questions naturally - AI will understand and fetch the right data!")
 
@@ -237,62 +511,55 @@ with tab3:
     st.subheader("💬 Chat")
 
     # Display chat history
-    for message in st.session_state.chat_history:
+    if st.session_state.history_summary:
+        with st.expander("🗂️ Earlier in this conversation"):
+            st.markdown(st.session_state.history_summary)
+
+    for message in load_recent_messages():
         with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+            st.markdown(render_parts(message["parts"]))
 
     # Chat input
-    user_input = st.chat_input("Ask me anything about stocks, Bitcoin, or financial news...")
+    user_input = st.chat_input(CHAT_PLACEHOLDER)
+
+    # Drop submits that repeat the last one; Streamlit already runs one
+    # script run at a time per session, so replies never overlap
+    if user_input and is_repeat_submit(user_input):
+        user_input = None
 
     if user_input:
         # Add user message to chat
-        st.session_state.chat_history.append({"role": "user", "content": user_input})
+        save_message("user", [{"type": "text", "data": user_input}])
 
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        # Process query
+        # Process query, streaming each part as soon as it arrives
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                if st.session_state.assistant is None:
-                    initialize_assistant(api_key)
-
-                result = st.session_state.assistant.process_query(user_input)
-
-                response_parts = []
-
-                # Format response based on what was found
-                intent = result['analysis'].get('intent', 'unknown')
-
-                if intent == 'unknown':
-                    response_parts.append("I'm not sure what you're asking for. Please try:")
-                    response_parts.append("- 'AAPL stock price'")
-                    response_parts.append("- 'Bitcoin value'")
-                    response_parts.append("- 'Scrape [URL] for [query]'")
-
-                # Stock data
-                if result.get('stock_data'):
-                    response_parts.append(format_stock_response(result['stock_data']))
-
-                # Bitcoin data
-                if result.get('bitcoin_data'):
-                    response_parts.append(format_bitcoin_response(result['bitcoin_data']))
+                parts = []
+                st.write_stream(stream_response(user_input, parts))
 
-                # Scraped data
-                if result.get('scraped_data'):
-                    for scraped in result['scraped_data']:
-                        response_parts.append(format_scraped_response(scraped))
-
-                response = "\n\n---\n\n".join(response_parts) if response_parts else "I couldn't find any relevant information."
-
-                st.markdown(response)
+                if not parts:
+                    parts = [{"type": "text", "data": "I couldn't find any relevant information."}]
+                    st.markdown(render_parts(parts))
 
                 # Add assistant response to chat history
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                save_message("assistant", parts)
+
+                # Fold messages that scrolled out of the window into the summary
+                unsummarized = count_messages() - MAX_TURNS - st.session_state.history_summarized
+                if unsummarized >= SUMMARY_BATCH:
+                    older = load_messages(st.session_state.history_summarized, unsummarized)
+                    st.session_state.history_summary = summarize_history(older, st.session_state.history_summary)
+                    st.session_state.history_summarized += unsummarized
 
     # Clear chat button
     if st.button("🗑️ Clear Chat History"):
-        st.session_state.chat_history = []
+        with get_chat_db() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (st.session_state.session_id,))
+        st.session_state.history_summary = ""
+        st.session_state.history_summarized = 0
         st.rerun()
 
     st.divider()
@@ -315,6 +582,10 @@ with tab3:
         """)
 
 
+with tab3:
+    render_chat()
+
+
 # Footer
 st.divider()
 st.markdown("""
@@ -4,16 +4,85 @@ Combines stock/Bitcoin price fetching with intelligent web scraping.
 Uses Gemini LLM for query understanding and content relevance filtering.
 """
 
+import asyncio
+import hashlib
 import logging
+import queue
 import re
 import os
 import ssl
-from typing import Any, Dict, List, Optional, TypedDict
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple, TypedDict
 
+import aiohttp
 import requests
 import urllib3
+from cachetools import TTLCache
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses several times faster; the stdlib json accepts the same bytes and str input
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+except ImportError:
+    genai = None
+
+# HTML parsers, fastest first
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+# requests and aiohttp only decode brotli bodies when the brotli package is installed
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+# Sent with every outbound request
+_BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': _ACCEPT_ENCODING
+}
+
+# Five daily bars are enough for the current price and previous close
+_YAHOO_CHART_PARAMS = {"interval": "1d", "range": "5d"}
 
 # SSL bypass for corporate firewalls
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -22,6 +91,24 @@ os.environ['CURL_CA_BUNDLE'] = ''
 os.environ['REQUESTS_CA_BUNDLE'] = ''
 
 
+# How long fetched prices and page analyses are reused, in seconds
+PRICE_CACHE_TTL = 60
+PRICE_ERROR_CACHE_TTL = 15
+SCRAPE_CACHE_TTL = 60 * 60
+IRRELEVANT_SCRAPE_CACHE_TTL = 5 * 60
+LLM_CACHE_TTL = 24 * 60 * 60
+
+# Page bodies are read up to MAX_PAGE_BYTES; HTML beyond MAX_PARSE_CHARS is dropped before parsing
+MAX_PAGE_BYTES = 512 * 1024
+MAX_PARSE_CHARS = 256 * 1024
+
+# Shared pool for blocking HTTP calls that can run side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Hosts every session talks to, connected ahead of the first query
+_WARM_UP_URLS = ("https://query2.finance.yahoo.com/", "https://api.coinlore.net/")
+
+
 class Settings(BaseSettings):
     """Configuration settings."""
     GOOGLE_API_KEY: str = ""
@@ -38,6 +125,59 @@ class Settings(BaseSettings):
         return self.GEMINI_API_KEY or self.GOOGLE_API_KEY
 
 
+def _run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is available."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
+def _open_scrape_session() -> aiohttp.ClientSession:
+    """Create the pooled aiohttp session used for concurrent scraping."""
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20, ssl=False))
+
+
+async def _tagged(key: str, job: Awaitable) -> Tuple[str, Any]:
+    """Await a job and pair its result, or its error, with the result key."""
+    try:
+        return key, await job
+    except Exception as e:
+        return key, {"error": str(e)}
+
+
+def build_http_session() -> requests.Session:
+    """Build a keep-alive HTTP session with browser headers, pooling and retries."""
+    session = requests.Session()
+    session.headers.update(_BROWSER_HEADERS)
+    session.verify = False
+
+    retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def build_http2_client():
+    """Build an HTTP/2 client for the JSON price APIs, or None without httpx[http2].
+
+    Parallel chart and quote calls share one multiplexed TLS connection per host.
+    """
+    if httpx is None:
+        return None
+    try:
+        transport = httpx.HTTPTransport(
+            http2=True,
+            verify=False,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32)
+        )
+        return httpx.Client(transport=transport, headers=_BROWSER_HEADERS, timeout=10.0)
+    except ImportError:
+        # httpx is installed without the h2 extra
+        return None
+
+
 def setup_logging(level: int = logging.INFO) -> None:
     """Configure logging."""
     logger = logging.getLogger()
@@ -53,6 +193,66 @@ def setup_logging(level: int = logging.INFO) -> None:
     logger.addHandler(handler)
 
 
+# Patterns used on every query or page, compiled once
+_URL_RE = re.compile(r'https?://[^\s]+')
+_NON_WORD_RE = re.compile(r'\W+')
+
+# "Scrape <url> for <topic>" names its own topic, so it needs no Gemini call;
+# a topic that also asks for a price needs both intents and is left to Gemini
+_SCRAPE_RE = re.compile(r'^\s*scrape\s+(https?://\S+)\s+for\s+(.+)$', re.IGNORECASE)
+_PRICE_HINT_RE = re.compile(r'\b(price|btc|bitcoin)\b', re.IGNORECASE)
+
+# (second, formatted) for the last timestamp handed out; replaced as one tuple so threads never see half an update
+_last_timestamp = (0, "")
+
+
+def _now_str() -> str:
+    """Current local time as "YYYY-MM-DD HH:MM:SS", formatted at most once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    second, formatted = _last_timestamp
+    if second != now:
+        formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _last_timestamp = (now, formatted)
+    return formatted
+
+
+def _digest(text: str) -> bytes:
+    """Hash text into a short cache key; blake2b is fast and no security is needed."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class QueryAnalysis(BaseModel):
+    """Gemini's reading of a user query."""
+    intent: str
+    ticker: Optional[str]
+    company_name: Optional[str]
+    urls: List[str]
+    search_query: Optional[str]
+
+
+class PageAnalysis(BaseModel):
+    """Gemini's verdict on one scraped page."""
+    relevant: bool
+    summary: str
+    key_points: List[str]
+
+
+class DocumentAnalysis(PageAnalysis):
+    """A page verdict from a batched prompt, tagged with its document number."""
+    document: int
+
+
+# Gemini returns bare JSON in these shapes, so replies are parsed as they are
+_QUERY_ANALYSIS_CONFIG = {"response_mime_type": "application/json", "response_schema": QueryAnalysis}
+_PAGE_ANALYSIS_CONFIG = {"response_mime_type": "application/json", "response_schema": PageAnalysis}
+_BATCH_ANALYSIS_CONFIG = {"response_mime_type": "application/json", "response_schema": list[DocumentAnalysis]}
+
+
+# A query that is nothing but a ticker, e.g. "AAPL" or "$TSLA"
+_BARE_TICKER_RE = re.compile(r'^\s*\$?([A-Z]{1,5})\s*$')
+
+
 # Company name to ticker lookup
 COMPANY_LOOKUP = {
     'apple': 'AAPL', 'microsoft': 'MSFT', 'google': 'GOOGL', 'alphabet': 'GOOGL',
@@ -73,47 +273,236 @@ COMPANY_LOOKUP = {
     'snapchat': 'SNAP', 'paypal': 'PYPL', 'square': 'SQ', 'robinhood': 'HOOD'
 }
 
+# Company names longest first, so "general motors" beats "gm"
+_COMPANY_NAMES = tuple(sorted(COMPANY_LOOKUP, key=len, reverse=True))
+
+# All company names in one pattern
+_COMPANY_RE = re.compile(r'\b(' + '|'.join(re.escape(name) for name in _COMPANY_NAMES) + r')\b', re.IGNORECASE)
+
+# Ticker-shaped words, and the common upper-case words that are never tickers
+_TICKER_RE = re.compile(r'\b[A-Z]{2,5}\b')
+_COMMON_WORDS = frozenset({'I', 'IS', 'IT', 'IN', 'ON', 'TO', 'OF', 'THE', 'AND', 'OR', 'BUT', 'GET', 'CAN', 'HOW', 'YOU', 'YOUR'})
+
+
+# Short queries are matched token by token; "&" is kept so "procter & gamble" survives
+SHORT_QUERY_TOKENS = 15
+_TOKEN_RE = re.compile(r'\w+|&')
+_COMPANY_TOKENS = {tuple(_TOKEN_RE.findall(name)): ticker for name, ticker in COMPANY_LOOKUP.items()}
+_MAX_COMPANY_TOKENS = max(len(tokens) for tokens in _COMPANY_TOKENS)
+
+
+def _build_ticker_scanner():
+    """Compile every company name plus the ticker pattern into one Hyperscan database."""
+    expressions = [rb'\b' + re.escape(name).encode() + rb'\b' for name in _COMPANY_NAMES] + [_TICKER_RE.pattern.encode()]
+    flags = [hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_COMPANY_NAMES) + [hyperscan.HS_FLAG_SOM_LEFTMOST]
+
+    database = hyperscan.Database()
+    database.compile(expressions=expressions, ids=list(range(len(expressions))),
+                     elements=len(expressions), flags=flags)
+    return database
+
+
+# One pass over the text finds company names and tickers together; None without hyperscan
+_TICKER_SCANNER = _build_ticker_scanner() if hyperscan else None
+
 
 class FinancialAssistant:
     """Main financial assistant class."""
 
-    def __init__(self, google_api_key: Optional[str] = None):
-        """Initialize the assistant."""
+    def __init__(self, google_api_key: Optional[str] = None,
+                 http_session: Optional[requests.Session] = None,
+                 api_client=None):
+        """Initialize the assistant.
+
+        http_session is used for page scrapes so callers can share a
+        pooled, keep-alive session; a plain one is created if omitted.
+        api_client carries the Yahoo and Coinlore calls, e.g. a shared
+        build_http2_client(). Without it they use http_session when one is
+        passed, and otherwise an own HTTP/2 client when httpx[http2] is
+        installed.
+        """
         self.settings = Settings()
         if google_api_key:
             self.settings.GOOGLE_API_KEY = google_api_key
+        self._session = http_session or build_http_session()
+        if api_client is None:
+            api_client = self._session if http_session is not None else build_http2_client() or self._session
+        self._api_client = api_client
+        self._warm_up()
+
+        # Configure Gemini once; every prompt reuses the same model
+        self._gemini = None
+        if self.settings.api_key:
+            if genai is None:
+                logging.error("google-generativeai is not installed, Gemini features are disabled")
+            else:
+                self._gemini = genai.GenerativeModel('gemini-2.5-flash')
+                # genai.configure() is process-wide, and assistants for different keys
+                # share the process, so each model gets its own client for its key.
+                # google-generativeai 0.8.6 only builds the default client when
+                # GenerativeModel._client is still None, so setting it first wins.
+                self._gemini._client = glm.GenerativeServiceClient(
+                    client_options={"api_key": self.settings.api_key}
+                )
+        self._intent_cache = TTLCache(maxsize=512, ttl=LLM_CACHE_TTL)
+        # Prices move by the minute; page analyses stay useful much longer
+        self._price_cache = TTLCache(maxsize=512, ttl=PRICE_CACHE_TTL)
+        self._price_error_cache = TTLCache(maxsize=16, ttl=PRICE_ERROR_CACHE_TTL)
+        self._scrape_cache = TTLCache(maxsize=256, ttl=SCRAPE_CACHE_TTL)
+        self._irrelevant_scrape_cache = TTLCache(maxsize=256, ttl=IRRELEVANT_SCRAPE_CACHE_TTL)
+        self._llm_cache = TTLCache(maxsize=4096, ttl=LLM_CACHE_TTL)
+        self._cache_lock = threading.Lock()
         setup_logging()
 
+    def _warm_up(self) -> None:
+        """Open pooled connections to the price APIs in the background.
+
+        The first real query then reuses a connection whose DNS lookup and
+        TLS handshake are already done.
+        """
+        for url in _WARM_UP_URLS:
+            _EXECUTOR.submit(self._api_client.head, url, timeout=5)
+
+    def _cache_get(self, cache: TTLCache, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Look up a cached result, returning a copy so callers can't mutate the cache."""
+        with self._cache_lock:
+            cached = cache.get(key)
+        return dict(cached) if cached is not None else None
+
+    def _cache_put(self, cache: TTLCache, key: Tuple, result: Dict[str, Any]) -> None:
+        """Cache a result unless it is an error, so failures are retried next time."""
+        if "error" not in result:
+            with self._cache_lock:
+                cache[key] = result
+
+    def _scrape_cache_get(self, url: str, query: str) -> Optional[Dict[str, Any]]:
+        """Look up an earlier analysis of url for query."""
+        return (self._cache_get(self._scrape_cache, (url, query))
+                or self._cache_get(self._irrelevant_scrape_cache, (url, query)))
+
+    def _scrape_cache_put(self, url: str, query: str, result: Dict[str, Any]) -> None:
+        """Cache a scrape result, keeping "not relevant" verdicts for a shorter time."""
+        if result.get("relevant") is False:
+            self._cache_put(self._irrelevant_scrape_cache, (url, query), result)
+        else:
+            self._cache_put(self._scrape_cache, (url, query), result)
+
     def find_ticker_from_text(self, text: str) -> Optional[str]:
         """Extract ticker symbol from text."""
-        text_lower = text.lower()
+        tokens = _TOKEN_RE.findall(text)
+        if len(tokens) <= SHORT_QUERY_TOKENS:
+            return self._ticker_from_tokens(tokens)
+
+        if _TICKER_SCANNER is not None:
+            return self._scan_ticker_from_text(text)
 
         # Check company names
-        for company_name in sorted(COMPANY_LOOKUP.keys(), key=len, reverse=True):
-            if company_name in text_lower:
-                return COMPANY_LOOKUP[company_name]
+        company_match = _COMPANY_RE.search(text)
+        if company_match:
+            return COMPANY_LOOKUP[company_match.group(1).lower()]
 
         # Check for ticker patterns
-        stock_pattern = r'\b[A-Z]{2,5}\b'
-        matches = re.findall(stock_pattern, text)
-        common_words = {'I', 'IS', 'IT', 'IN', 'ON', 'TO', 'OF', 'THE', 'AND', 'OR', 'BUT', 'GET', 'CAN', 'HOW', 'YOU', 'YOUR'}
-        valid_tickers = [m for m in matches if m not in common_words]
+        return next((m for m in _TICKER_RE.findall(text) if m not in _COMMON_WORDS), None)
+
+    def _ticker_from_tokens(self, tokens: List[str]) -> Optional[str]:
+        """Token-lookup version of find_ticker_from_text for short queries."""
+        lowered = [token.lower() for token in tokens]
+
+        # Leftmost company name first, longest name at each position
+        for start in range(len(lowered)):
+            for size in range(min(_MAX_COMPANY_TOKENS, len(lowered) - start), 0, -1):
+                ticker = _COMPANY_TOKENS.get(tuple(lowered[start:start + size]))
+                if ticker:
+                    return ticker
+
+        return next((token for token in tokens
+                     if 2 <= len(token) <= 5 and token.isascii() and token.isalpha() and token.isupper()
+                     and token not in _COMMON_WORDS), None)
+
+    def _scan_ticker_from_text(self, text: str) -> Optional[str]:
+        """Hyperscan version of find_ticker_from_text, picking the same match the regexes would."""
+        data = text.encode()
+        companies, tickers = [], []
+
+        def on_match(pattern_id, start, end, flags, context):
+            if pattern_id < len(_COMPANY_NAMES):
+                # Leftmost first, then longest, like the alternation regex
+                companies.append((start, start - end, _COMPANY_NAMES[pattern_id]))
+            else:
+                tickers.append((start, data[start:end].decode()))
+
+        _TICKER_SCANNER.scan(data, match_event_handler=on_match)
+
+        if companies:
+            return COMPANY_LOOKUP[min(companies)[2]]
+        return next((m for _, m in sorted(tickers) if m not in _COMMON_WORDS), None)
+
+    def fetch_stock_price(self, ticker: str, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch stock price from Yahoo Finance API, reusing it for PRICE_CACHE_TTL seconds.
+
+        Pass refresh=True to skip the cached price and fetch a fresh one.
+        """
+        return self.fetch_stock_prices([ticker], refresh=refresh)[ticker]
+
+    def fetch_stock_prices(self, tickers: List[str], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Fetch several stock prices at once, keyed by ticker.
+
+        One quote request covers every symbol; the chart API needs a call per
+        symbol, so those run side by side on the shared executor. With
+        refresh=True every ticker is fetched again and the cache updated.
+        """
+        results = {}
+        pending = []
+        for ticker in tickers:
+            cached = None if refresh else self._cache_get(self._price_cache, ("stock", ticker.upper()))
+            if cached is not None:
+                results[ticker] = cached
+            else:
+                pending.append(ticker)
+
+        if not pending:
+            return results
+
+        logging.info(f"Fetching stock data for: {', '.join(pending)}")
+
+        quote_future = _EXECUTOR.submit(self._fetch_quotes, pending)
+        chart_futures = {
+            ticker: _EXECUTOR.submit(
+                self._api_client.get,
+                f"https://query2.finance.yahoo.com/v8/finance/chart/{ticker}",
+                params=_YAHOO_CHART_PARAMS,
+                timeout=10
+            )
+            for ticker in pending
+        }
 
-        return valid_tickers[0] if valid_tickers else None
+        quotes = quote_future.result()
+        for ticker in pending:
+            result = self._build_stock_result(ticker, chart_futures[ticker], quotes.get(ticker.upper()))
+            self._cache_put(self._price_cache, ("stock", ticker.upper()), result)
+            results[ticker] = result
+        return results
 
-    def fetch_stock_price(self, ticker: str) -> Dict[str, Any]:
-        """Fetch stock price from Yahoo Finance API."""
-        logging.info(f"Fetching stock data for: {ticker}")
+    def _fetch_quotes(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quote details for several symbols in one request, keyed by upper-case symbol."""
+        quote_url = "https://query2.finance.yahoo.com/v7/finance/quote"
 
         try:
-            # Chart API
-            url = f"https://query2.finance.yahoo.com/v8/finance/chart/{ticker}"
-            params = {"interval": "1d", "range": "5d"}
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+            quote_response = self._api_client.get(quote_url, params={"symbols": ",".join(tickers)}, timeout=10)
+            quote_response.raise_for_status()
+            quote_data = _json.loads(quote_response.content)
+            return {quote["symbol"].upper(): quote for quote in quote_data["quoteResponse"]["result"]}
+        except Exception as e:
+            # The chart data alone is enough for a price
+            logging.warning(f"Error fetching quote details: {e}")
+            return {}
 
-            response = requests.get(url, params=params, headers=headers, timeout=10, verify=False)
+    def _build_stock_result(self, ticker: str, chart_future, quote_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine a ticker's chart response with its quote details, if any."""
+        try:
+            response = chart_future.result()
             response.raise_for_status()
-            data = response.json()
+            data = _json.loads(response.content)
 
             if 'chart' not in data or 'result' not in data['chart']:
                 return {"error": f"No data found for ticker {ticker}"}
@@ -126,27 +515,12 @@ class FinancialAssistant:
             change = current_price - previous_close
             change_percent = (change / previous_close * 100) if previous_close != 0 else 0
 
-            # Quote API for additional info
-            quote_url = f"https://query2.finance.yahoo.com/v7/finance/quote"
-            quote_params = {"symbols": ticker}
-
-            try:
-                quote_response = requests.get(quote_url, params=quote_params, headers=headers, timeout=10, verify=False)
-                quote_response.raise_for_status()
-                quote_data = quote_response.json()
-
-                if 'quoteResponse' in quote_data and 'result' in quote_data['quoteResponse']:
-                    quote_info = quote_data['quoteResponse']['result'][0]
-                    company_name = quote_info.get('longName') or quote_info.get('shortName', ticker)
-                    market_cap = quote_info.get('marketCap')
-                    high = quote_info.get('regularMarketDayHigh', current_price)
-                    low = quote_info.get('regularMarketDayLow', current_price)
-                else:
-                    company_name = ticker
-                    market_cap = None
-                    high = current_price
-                    low = current_price
-            except:
+            if quote_info:
+                company_name = quote_info.get('longName') or quote_info.get('shortName', ticker)
+                market_cap = quote_info.get('marketCap')
+                high = quote_info.get('regularMarketDayHigh', current_price)
+                low = quote_info.get('regularMarketDayLow', current_price)
+            else:
                 company_name = ticker
                 market_cap = None
                 high = current_price
@@ -163,14 +537,35 @@ class FinancialAssistant:
                 "low": round(low, 2),
                 "currency": meta.get('currency', 'USD'),
                 "market_cap": market_cap,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": _now_str()
             }
 
         except Exception as e:
             logging.error(f"Error fetching stock data: {e}")
             return {"error": str(e)}
 
-    def fetch_bitcoin_price(self) -> Dict[str, Any]:
+    def fetch_bitcoin_price(self, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch Bitcoin price from Coinlore API, reusing it for PRICE_CACHE_TTL seconds.
+
+        Pass refresh=True to skip the cached price and fetch a fresh one.
+        """
+        if not refresh:
+            cached = (self._cache_get(self._price_cache, ("btc",))
+                      or self._cache_get(self._price_error_cache, ("btc",)))
+            if cached is not None:
+                return cached
+
+        result = self._fetch_bitcoin_price()
+        if "error" in result:
+            # The live widget falls back to this on every tick while the stream
+            # is down; hold a failure briefly instead of retrying each time
+            with self._cache_lock:
+                self._price_error_cache[("btc",)] = result
+        else:
+            self._cache_put(self._price_cache, ("btc",), result)
+        return result
+
+    def _fetch_bitcoin_price(self) -> Dict[str, Any]:
         """Fetch Bitcoin price from Coinlore API."""
         logging.info("Fetching Bitcoin data")
 
@@ -178,9 +573,9 @@ class FinancialAssistant:
             url = "https://api.coinlore.net/api/ticker/"
             params = {"id": "90"}  # Bitcoin ID
 
-            response = requests.get(url, params=params, timeout=10, verify=False)
+            response = self._api_client.get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _json.loads(response.content)
 
             if not data or len(data) == 0:
                 return {"error": "Could not fetch Bitcoin data"}
@@ -196,7 +591,7 @@ class FinancialAssistant:
                 "change_7d": float(bitcoin_info.get("percent_change_7d", 0)),
                 "volume_24h": float(bitcoin_info.get("volume24", 0)) if bitcoin_info.get("volume24") else None,
                 "market_cap": float(bitcoin_info.get("market_cap_usd", 0)) if bitcoin_info.get("market_cap_usd") else None,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": _now_str()
             }
 
         except Exception as e:
@@ -207,51 +602,201 @@ class FinancialAssistant:
         """Scrape a URL for relevant information using Gemini."""
         logging.info(f"Scraping URL: {url} for query: {query}")
 
-        api_key = self.settings.api_key
-        if not api_key:
+        if self._gemini is None:
             return {"error": "Google/Gemini API key not configured"}
 
+        cached = self._scrape_cache_get(url, query)
+        if cached is not None:
+            logging.info(f"Using cached analysis of {url}")
+            return cached
+
         try:
             # Step 1: Fetch the webpage content
             logging.info(f"Fetching webpage: {url}")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            # Stop reading once there is more HTML than the parser will look at
+            with self._session.get(url, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                chunks, total = [], 0
+                for chunk in response.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if total >= MAX_PAGE_BYTES:
+                        break
+                html_content = b"".join(chunks).decode(response.encoding or 'utf-8', errors='replace')
+
+            result = self._analyze_pages([(url, html_content)], query)[0]
+            self._scrape_cache_put(url, query, result)
+            return result
 
-            response = requests.get(url, headers=headers, timeout=15, verify=False)
-            response.raise_for_status()
-            html_content = response.text
-
-            # Step 2: Extract text from HTML using BeautifulSoup
-            try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-
-                # Remove script and style elements
-                for script in soup(["script", "style", "nav", "footer", "header"]):
-                    script.decompose()
-
-                # Get text
-                text_content = soup.get_text(separator=' ', strip=True)
-
-                # Limit to first 8000 characters to avoid token limits
-                text_content = text_content[:8000]
-
-                logging.info(f"Extracted {len(text_content)} characters from webpage")
-
-            except ImportError:
-                # Fallback: simple HTML tag removal
-                import re
-                text_content = re.sub('<[^<]+?>', '', html_content)
-                text_content = text_content[:8000]
-
-            # Step 3: Use Gemini to analyze the content
-            logging.info(f"Analyzing content with Gemini...")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error fetching URL: {e}")
+            return {"error": f"Failed to fetch webpage: {str(e)}", "url": url}
+        except Exception as e:
+            logging.error(f"Error scraping URL: {e}")
+            return {"error": str(e), "url": url}
 
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.5-flash')
+    async def _scrape_urls_async(self, session: aiohttp.ClientSession, urls: List[str],
+                                 query: str) -> List[Dict[str, Any]]:
+        """Fetch all URLs concurrently, then analyze every page in one Gemini call."""
+        logging.info(f"Scraping {len(urls)} URLs for query: {query}")
+
+        if self._gemini is None:
+            return [{"error": "Google/Gemini API key not configured"} for _ in urls]
+
+        results: List[Optional[Dict[str, Any]]] = [self._scrape_cache_get(url, query) for url in urls]
+        pending = [idx for idx, cached in enumerate(results) if cached is None]
+
+        fetched = await asyncio.gather(*[self._fetch_page_async(session, urls[idx]) for idx in pending],
+                                       return_exceptions=True)
+
+        pages = []
+        for idx, html_content in zip(pending, fetched):
+            url = urls[idx]
+            if isinstance(html_content, aiohttp.ClientError):
+                logging.error(f"Error fetching URL: {html_content}")
+                results[idx] = {"error": f"Failed to fetch webpage: {str(html_content)}", "url": url}
+            elif isinstance(html_content, Exception):
+                logging.error(f"Error scraping URL: {html_content}")
+                results[idx] = {"error": str(html_content), "url": url}
+            else:
+                pages.append((idx, url, html_content))
 
+        if pages:
+            try:
+                analyzed = await self._analyze_pages_async(
+                    [(url, html_content) for _, url, html_content in pages], query
+                )
+            except Exception as e:
+                logging.error(f"Error scraping URL: {e}")
+                analyzed = [{"error": str(e), "url": url} for _, url, _ in pages]
+
+            for (idx, url, _), page_result in zip(pages, analyzed):
+                results[idx] = page_result
+                self._scrape_cache_put(url, query, page_result)
+
+        return results
+
+    async def _fetch_page_async(self, session: aiohttp.ClientSession, url: str) -> str:
+        """Fetch a webpage's HTML through a shared aiohttp session."""
+        logging.info(f"Fetching webpage: {url}")
+        async with session.get(url, headers=_BROWSER_HEADERS, timeout=aiohttp.ClientTimeout(total=15)) as response:
+            response.raise_for_status()
+            chunks, total = [], 0
+            async for chunk in response.content.iter_chunked(16384):
+                chunks.append(chunk)
+                total += len(chunk)
+                if total >= MAX_PAGE_BYTES:
+                    break
+            return b"".join(chunks).decode(response.charset or 'utf-8', errors='replace')
+
+    def _extract_text(self, html_content: str) -> str:
+        """Extract readable text from HTML, capped to keep prompts small."""
+        # Only 8000 characters of text survive, so the tail of a large page is never needed
+        html_content = html_content[:MAX_PARSE_CHARS]
+
+        if HTMLParser is not None:
+            tree = HTMLParser(html_content)
+
+            # Remove script and style elements
+            for node in tree.css("script, style, nav, footer, header"):
+                node.decompose()
+
+            # Get text
+            root = tree.body or tree.root
+            text_content = root.text(separator=' ', strip=True) if root else ""
+
+        elif lxml_html is not None:
+            # Fallback: lxml, also a C parser
+            document = lxml_html.fromstring(html_content)
+
+            for node in document.xpath("//script|//style|//nav|//footer|//header"):
+                node.drop_tree()
+
+            text_content = ' '.join(document.text_content().split())
+
+        elif BeautifulSoup is not None:
+            # Last resort: BeautifulSoup with the pure-Python parser
+            soup = BeautifulSoup(html_content, 'html.parser')
+
+            for node in soup(["script", "style", "nav", "footer", "header"]):
+                node.decompose()
+
+            text_content = soup.get_text(separator=' ', strip=True)
+
+        else:
+            raise ImportError("selectolax, lxml or beautifulsoup4 is required to extract webpage text")
+
+        # Limit to first 8000 characters to avoid token limits
+        text_content = text_content[:8000]
+
+        logging.info(f"Extracted {len(text_content)} characters from webpage")
+        return text_content
+
+    def _analyze_pages(self, pages: List[Tuple[str, str]], query: str) -> List[Dict[str, Any]]:
+        """Ask Gemini for query-relevant information on each (url, html) page.
+
+        All pages go into a single prompt so N URLs cost one Gemini round-trip.
+        """
+        texts = [(url, self._extract_text(html_content)) for url, html_content in pages]
+        results, pending = self._cached_page_analyses(texts, query)
+
+        if pending:
+            # Use Gemini to analyze the content
+            logging.info(f"Analyzing {len(pending)} page(s) with Gemini...")
+
+            response = self._gemini.generate_content(self._build_analysis_prompt(pending, query),
+                                                     generation_config=self._analysis_config(pending))
+            self._fill_page_analyses(texts, query, results, self._read_page_analyses(pending, query, response.text))
+        return results
+
+    async def _analyze_pages_async(self, pages: List[Tuple[str, str]], query: str) -> List[Dict[str, Any]]:
+        """Async version of _analyze_pages that keeps parsing and Gemini off the event loop."""
+        # HTML parsing is CPU-bound, keep it off the event loop
+        texts = await asyncio.to_thread(
+            lambda: [(url, self._extract_text(html_content)) for url, html_content in pages]
+        )
+
+        results, pending = self._cached_page_analyses(texts, query)
+
+        if pending:
+            logging.info(f"Analyzing {len(pending)} page(s) with Gemini...")
+
+            # genai's async client is bound to the first event loop that used it, and
+            # _run_async starts a new loop per call, so the sync client runs in a thread
+            response = await asyncio.to_thread(self._gemini.generate_content,
+                                               self._build_analysis_prompt(pending, query),
+                                               generation_config=self._analysis_config(pending))
+            self._fill_page_analyses(texts, query, results, self._read_page_analyses(pending, query, response.text))
+        return results
+
+    def _page_key(self, url: str, query: str, text_content: str) -> Tuple:
+        """Key a page analysis on the URL, the query and a digest of the page text."""
+        return "page", url, query, _digest(text_content)
+
+    def _cached_page_analyses(self, texts: List[Tuple[str, str]], query: str):
+        """Split pages into cached results and the pages Gemini still has to analyze."""
+        results = [self._cache_get(self._llm_cache, self._page_key(url, query, text_content))
+                   for url, text_content in texts]
+        pending = [page for page, cached in zip(texts, results) if cached is None]
+        return results, pending
+
+    def _fill_page_analyses(self, texts: List[Tuple[str, str]], query: str,
+                            results: List[Optional[Dict[str, Any]]], analyzed: List[Dict[str, Any]]) -> None:
+        """Put fresh analyses into the slots the cache couldn't fill, and cache them."""
+        fresh = iter(analyzed)
+        for idx, (url, text_content) in enumerate(texts):
+            if results[idx] is None:
+                results[idx] = next(fresh)
+                self._cache_put(self._llm_cache, self._page_key(url, query, text_content), results[idx])
+
+    def _analysis_config(self, texts: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Pick the response schema for a single-page or batched analysis prompt."""
+        return _PAGE_ANALYSIS_CONFIG if len(texts) == 1 else _BATCH_ANALYSIS_CONFIG
+
+    def _build_analysis_prompt(self, texts: List[Tuple[str, str]], query: str) -> str:
+        """Build the Gemini prompt for one or several (url, text) pages."""
+        if len(texts) == 1:
+            url, text_content = texts[0]
             analysis_prompt = f"""Analyze this webpage content and extract information about: "{query}"
 
 Webpage URL: {url}
@@ -270,61 +815,114 @@ Respond in JSON format:
     "key_points": ["point 1", "point 2", "point 3"] or []
 }}
 """
+        else:
+            documents = "\n".join(
+                f"===DOC {idx}===\nWebpage URL: {url}\nContent:\n{text_content}\n"
+                for idx, (url, text_content) in enumerate(texts, start=1)
+            )
+            analysis_prompt = f"""For each of the following webpages, extract information about: "{query}"
+
+{documents}
+Task, for every document:
+1. Find information related to "{query}"
+2. If relevant information is found, summarize it in 2-3 concise bullet points
+3. If NO relevant information is found, set "relevant" to false
+
+Respond with a JSON array holding one object per document, in document order:
+[
+    {{
+        "document": 1,
+        "relevant": true/false,
+        "summary": "your summary here or 'No relevant information found'",
+        "key_points": ["point 1", "point 2", "point 3"] or []
+    }}
+]
+"""
+        return analysis_prompt
 
-            response = model.generate_content(analysis_prompt)
-            result_text = response.text.strip()
-
-            # Extract JSON from response
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
+    def _read_page_analyses(self, texts: List[Tuple[str, str]], query: str,
+                            result_text: str) -> List[Dict[str, Any]]:
+        """Parse Gemini's reply into one scrape result per (url, text) page."""
+        analysis = _json.loads(result_text)
 
-            import json
-            analysis = json.loads(result_text)
+        logging.info(f"Gemini analysis complete")
 
-            logging.info(f"Gemini analysis complete")
+        if len(texts) == 1:
+            analyses = {1: analysis}
+        else:
+            analyses = {int(item.get("document", idx)): item for idx, item in enumerate(analysis, start=1)}
 
-            # Format response
-            if not analysis.get("relevant", False):
-                return {
-                    "relevant": False,
-                    "message": f"No relevant information found about '{query}' on this page.",
-                    "url": url
-                }
+        results = []
+        for idx, (url, _) in enumerate(texts, start=1):
+            if idx in analyses:
+                results.append(self._format_page_analysis(url, query, analyses[idx]))
             else:
-                return {
-                    "relevant": True,
-                    "data": {
-                        "summary": analysis.get("summary", ""),
-                        "key_points": analysis.get("key_points", [])
-                    },
-                    "url": url,
-                    "query": query
-                }
+                results.append({"error": "No analysis returned for this page", "url": url})
+        return results
 
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching URL: {e}")
-            return {"error": f"Failed to fetch webpage: {str(e)}", "url": url}
-        except Exception as e:
-            logging.error(f"Error scraping URL: {e}")
-            return {"error": str(e), "url": url}
+    def _format_page_analysis(self, url: str, query: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn Gemini's verdict on one page into a scrape result."""
+        if not analysis.get("relevant", False):
+            return {
+                "relevant": False,
+                "message": f"No relevant information found about '{query}' on this page.",
+                "url": url
+            }
+        else:
+            return {
+                "relevant": True,
+                "data": {
+                    "summary": analysis.get("summary", ""),
+                    "key_points": analysis.get("key_points", [])
+                },
+                "url": url,
+                "query": query
+            }
+
+    def analyze_query(self, query: str) -> Dict[str, Any]:
+        """Work out what a query asks for, skipping Gemini whenever possible."""
+        scrape_match = _SCRAPE_RE.match(query)
+        if scrape_match and not _PRICE_HINT_RE.search(scrape_match.group(2)):
+            return {"intent": "web_scrape", "ticker": None, "company_name": None,
+                    "urls": [scrape_match.group(1)], "search_query": scrape_match.group(2).strip()}
+
+        # The rules settle most queries without a URL; only the rest go to Gemini,
+        # which is also what pulls a search topic out of other scrape requests
+        if not _URL_RE.search(query):
+            analysis = self._fallback_query_analysis(query)
+            if analysis["intent"] != "unknown":
+                return analysis
+
+        # Rephrasings that only differ in case or punctuation share one analysis;
+        # URLs are case-sensitive, so queries with URLs are keyed verbatim
+        key = query.strip() if "://" in query else _NON_WORD_RE.sub(' ', query.lower()).strip()
+
+        cached = self._cache_get(self._intent_cache, key)
+        if cached is not None:
+            logging.info(f"Using cached analysis for: {query}")
+            return cached
+
+        # Only real Gemini answers are cached; a fallback after a failure is retried next time
+        analysis = self._gemini_query_analysis(query)
+        if analysis is None:
+            return self._fallback_query_analysis(query)
+
+        self._cache_put(self._intent_cache, key, analysis)
+        return dict(analysis)
 
     def analyze_query_with_gemini(self, query: str) -> Dict[str, Any]:
         """Use Gemini to analyze the query and determine what action to take."""
+        return self._gemini_query_analysis(query) or self._fallback_query_analysis(query)
+
+    def _gemini_query_analysis(self, query: str) -> Optional[Dict[str, Any]]:
+        """Ask Gemini to analyze the query, or return None when it is unavailable or fails."""
         logging.info(f"Analyzing query with Gemini: {query}")
 
-        api_key = self.settings.api_key
-        if not api_key:
-            # Fallback to rule-based if no API key
-            return self._fallback_query_analysis(query)
+        if self._gemini is None:
+            # No API key, the caller falls back to the rules
+            return None
 
         try:
-            import google.generativeai as genai
-
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.5-flash')
-
             analysis_prompt = f"""Analyze this financial query and extract information:
 
 Query: "{query}"
@@ -354,32 +952,22 @@ Example 3: "Scrape https://finance.yahoo.com/news for market trends"
 → {{"intent": "web_scrape", "ticker": null, "company_name": null, "urls": ["https://finance.yahoo.com/news"], "search_query": "market trends"}}
 """
 
-            response = model.generate_content(analysis_prompt)
-            result_text = response.text.strip()
-
-            # Extract JSON from markdown code blocks if present
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
-
-            import json
-            analysis = json.loads(result_text)
+            response = self._gemini.generate_content(analysis_prompt, generation_config=_QUERY_ANALYSIS_CONFIG)
+            analysis = _json.loads(response.text)
 
             logging.info(f"Gemini analysis: {analysis}")
             return analysis
 
         except Exception as e:
             logging.error(f"Error analyzing query with Gemini: {e}")
-            return self._fallback_query_analysis(query)
+            return None
 
     def _fallback_query_analysis(self, query: str) -> Dict[str, Any]:
         """Fallback rule-based query analysis."""
         query_lower = query.lower()
 
         # Check for URLs
-        url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, query)
+        urls = _URL_RE.findall(query)
 
         # Check for Bitcoin
         if any(kw in query_lower for kw in ['bitcoin', 'btc', 'crypto']):
@@ -387,6 +975,11 @@ Example 3: "Scrape https://finance.yahoo.com/news for market trends"
                 return {"intent": "both", "ticker": None, "company_name": "Bitcoin", "urls": urls, "search_query": query}
             return {"intent": "bitcoin_price", "ticker": None, "company_name": "Bitcoin", "urls": [], "search_query": None}
 
+        # A lone upper-case word is a ticker, no need to scan for company names
+        bare_ticker = _BARE_TICKER_RE.match(query)
+        if bare_ticker:
+            return {"intent": "stock_price", "ticker": bare_ticker.group(1), "company_name": None, "urls": [], "search_query": None}
+
         # Check for ticker/company
         ticker = self.find_ticker_from_text(query)
 
@@ -405,7 +998,7 @@ Example 3: "Scrape https://finance.yahoo.com/news for market trends"
         logging.info(f"Processing query: {query}")
 
         # Analyze query
-        analysis = self.analyze_query_with_gemini(query)
+        analysis = self.analyze_query(query)
 
         result = {
             "query": query,
@@ -415,44 +1008,158 @@ Example 3: "Scrape https://finance.yahoo.com/news for market trends"
             "scraped_data": None
         }
 
-        intent = analysis.get("intent")
+        # Fetch prices and scrape URLs concurrently
+        result.update(_run_async(self._gather(analysis, query)))
 
-        # Execute based on intent
-        if intent == "stock_price":
-            ticker = analysis.get("ticker")
-            if ticker:
-                result["stock_data"] = self.fetch_stock_price(ticker)
+        return result
 
-        elif intent == "bitcoin_price":
-            result["bitcoin_data"] = self.fetch_bitcoin_price()
+    def iter_query(self, query: str) -> Iterator[Tuple[str, Any]]:
+        """Process a query, yielding each part of the result as soon as it is ready.
 
-        elif intent == "web_scrape":
-            urls = analysis.get("urls", [])
-            search_query = analysis.get("search_query", query)
-            if urls:
-                scraped_results = []
-                for url in urls:
-                    scraped_results.append(self.scrape_url(url, search_query))
-                result["scraped_data"] = scraped_results
-
-        elif intent == "both":
-            # Get price data
-            ticker = analysis.get("ticker")
-            if ticker:
-                result["stock_data"] = self.fetch_stock_price(ticker)
-            elif "bitcoin" in query.lower():
-                result["bitcoin_data"] = self.fetch_bitcoin_price()
-
-            # Scrape URLs
-            urls = analysis.get("urls", [])
-            search_query = analysis.get("search_query", query)
-            if urls:
-                scraped_results = []
-                for url in urls:
-                    scraped_results.append(self.scrape_url(url, search_query))
-                result["scraped_data"] = scraped_results
+        Yields ("analysis", analysis) first, then one ("stock_data", ...),
+        ("bitcoin_data", ...) or ("scraped_data", ...) pair per finished fetch.
+        """
+        logging.info(f"Processing query: {query}")
 
-        return result
+        analysis = self.analyze_query(query)
+        yield "analysis", analysis
+
+        finished = queue.Queue()
+
+        async def produce():
+            try:
+                async with _open_scrape_session() as session:
+                    jobs = self._plan_jobs(analysis, query, session)
+                    for next_done in asyncio.as_completed([_tagged(key, job) for key, job in jobs]):
+                        key, data = await next_done
+                        if key == "scraped_data" and isinstance(data, list):
+                            for scraped in data:
+                                finished.put((key, scraped))
+                        else:
+                            finished.put((key, data))
+            finally:
+                finished.put(None)
+
+        # The event loop runs in its own thread so results can be handed out while it works
+        worker = threading.Thread(target=_run_async, args=(produce(),), daemon=True)
+        worker.start()
+
+        while True:
+            item = finished.get()
+            if item is None:
+                break
+            yield item
+
+        worker.join()
+
+    def scrape_urls(self, urls: List[str], query: str) -> List[Dict[str, Any]]:
+        """Scrape several URLs concurrently and batch their analysis, returning results in URL order."""
+        async def scrape_all():
+            async with _open_scrape_session() as session:
+                return await self._scrape_urls_async(session, urls, query)
+
+        return _run_async(scrape_all())
+
+    def _plan_jobs(self, analysis: Dict[str, Any], query: str,
+                   session: aiohttp.ClientSession) -> List[Tuple[str, Awaitable]]:
+        """Turn a query analysis into (result key, coroutine) pairs to run together."""
+        intent = analysis.get("intent")
+        ticker = analysis.get("ticker")
+
+        # Price lookups are blocking requests calls, run them in worker threads
+        jobs = []
+        if intent in ("stock_price", "both") and ticker:
+            jobs.append(("stock_data", asyncio.to_thread(self.fetch_stock_price, ticker)))
+        elif intent == "bitcoin_price" or (intent == "both" and "bitcoin" in query.lower()):
+            jobs.append(("bitcoin_data", asyncio.to_thread(self.fetch_bitcoin_price)))
+
+        urls = analysis.get("urls", []) if intent in ("web_scrape", "both") else []
+        if urls:
+            search_query = analysis.get("search_query", query)
+            jobs.append(("scraped_data", self._scrape_urls_async(session, urls, search_query)))
+
+        return jobs
+
+    async def _gather(self, analysis: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """Run every fetch the analysis calls for at once and collect the results."""
+        async with _open_scrape_session() as session:
+            jobs = self._plan_jobs(analysis, query, session)
+            outcomes = await asyncio.gather(*[_tagged(key, job) for key, job in jobs])
+
+        return dict(outcomes)
+
+
+class BitcoinPriceStream:
+    """Keeps the latest Bitcoin ticker pushed over Binance's WebSocket stream."""
+
+    URL = "wss://stream.binance.com:9443/ws/btcusdt@ticker"
+    # Reconnect delays in seconds, doubling while the stream stays unreachable
+    RECONNECT_DELAY = 5.0
+    MAX_RECONNECT_DELAY = 300.0
+
+    def __init__(self, max_age: float = 30.0):
+        """Initialize the stream; ticks older than max_age seconds count as stale."""
+        self.max_age = max_age
+        self._latest: Optional[Dict[str, Any]] = None
+        self._received_at = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start listening in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=_run_async, args=(self._listen(),), daemon=True)
+            self._thread.start()
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the latest tick in fetch_bitcoin_price's format, or None if there is no fresh one."""
+        with self._lock:
+            if self._latest is None or time.monotonic() - self._received_at > self.max_age:
+                return None
+            return dict(self._latest)
+
+    async def _listen(self) -> None:
+        """Consume ticker messages, reconnecting with backoff whenever the socket drops.
+
+        A failed connection is logged once per outage, not on every attempt.
+        """
+        delay = self.RECONNECT_DELAY
+        failing = False
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.URL, heartbeat=30, ssl=False) as ws:
+                        logging.info("Connected to Bitcoin price stream")
+                        delay = self.RECONNECT_DELAY
+                        failing = False
+                        async for message in ws:
+                            if message.type == aiohttp.WSMsgType.TEXT:
+                                self._update(_json.loads(message.data))
+            except Exception as e:
+                if not failing:
+                    logging.warning(f"Bitcoin price stream disconnected, retrying with backoff: {e}")
+                failing = True
+
+            await asyncio.sleep(delay)
+            if failing:
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _update(self, tick: Dict[str, Any]) -> None:
+        """Store a Binance 24h ticker message."""
+        data = {
+            "name": "Bitcoin",
+            "symbol": "BTC",
+            "current_price": float(tick["c"]),
+            "change_24h": float(tick["P"]),
+            "change_1h": None,
+            "change_7d": None,
+            "volume_24h": float(tick["q"]),
+            "market_cap": None,
+            "timestamp": _now_str()
+        }
+        with self._lock:
+            self._latest = data
+            self._received_at = time.monotonic()
 
 
 def format_stock_response(data: Dict[str, Any]) -> str:
@@ -463,18 +1170,19 @@ def format_stock_response(data: Dict[str, Any]) -> str:
     change_symbol = "+" if data['change'] >= 0 else ""
     change_direction = "📈" if data['change'] >= 0 else "📉"
 
-    response = f"{change_direction} **{data['name']}** ({data['symbol']})\n"
-    response += f"**Current Price:** ${data['current_price']} {data['currency']}\n"
-    response += f"**Change:** {change_symbol}${data['change']} ({change_symbol}{data['change_percent']:.2f}%)\n"
-    response += f"**Previous Close:** ${data['previous_close']}\n"
-    response += f"**Day Range:** ${data['low']} - ${data['high']}\n"
+    parts = [
+        f"{change_direction} **{data['name']}** ({data['symbol']})",
+        f"**Current Price:** ${data['current_price']} {data['currency']}",
+        f"**Change:** {change_symbol}${data['change']} ({change_symbol}{data['change_percent']:.2f}%)",
+        f"**Previous Close:** ${data['previous_close']}",
+        f"**Day Range:** ${data['low']} - ${data['high']}",
+    ]
 
     if data.get('market_cap'):
-        market_cap_b = data['market_cap'] / 1e9
-        response += f"**Market Cap:** ${market_cap_b:.2f}B\n"
+        parts.append(f"**Market Cap:** ${data['market_cap'] / 1e9:.2f}B")
 
-    response += f"\n_Updated: {data['timestamp']}_"
-    return response
+    parts.append(f"\n_Updated: {data['timestamp']}_")
+    return "\n".join(parts)
 
 
 def format_bitcoin_response(data: Dict[str, Any]) -> str:
@@ -485,20 +1193,20 @@ def format_bitcoin_response(data: Dict[str, Any]) -> str:
     change_symbol = "+" if data['change_24h'] >= 0 else ""
     change_direction = "📈" if data['change_24h'] >= 0 else "📉"
 
-    response = f"{change_direction} **{data['name']}** ({data['symbol']})\n"
-    response += f"**Current Price:** ${data['current_price']:,.2f} USD\n"
-    response += f"**24h Change:** {change_symbol}{data['change_24h']:.2f}%\n"
+    parts = [
+        f"{change_direction} **{data['name']}** ({data['symbol']})",
+        f"**Current Price:** ${data['current_price']:,.2f} USD",
+        f"**24h Change:** {change_symbol}{data['change_24h']:.2f}%",
+    ]
 
     if data.get('market_cap'):
-        market_cap_b = data['market_cap'] / 1e9
-        response += f"**Market Cap:** ${market_cap_b:.2f}B\n"
+        parts.append(f"**Market Cap:** ${data['market_cap'] / 1e9:.2f}B")
 
     if data.get('volume_24h'):
-        volume_b = data['volume_24h'] / 1e9
-        response += f"**24h Volume:** ${volume_b:.2f}B\n"
+        parts.append(f"**24h Volume:** ${data['volume_24h'] / 1e9:.2f}B")
 
-    response += f"\n_Updated: {data['timestamp']}_"
-    return response
+    parts.append(f"\n_Updated: {data['timestamp']}_")
+    return "\n".join(parts)
 
 
 def format_scraped_response(data: Dict[str, Any]) -> str:
@@ -509,16 +1217,15 @@ def format_scraped_response(data: Dict[str, Any]) -> str:
     if not data.get("relevant", True):
         return f"ℹ️ {data.get('message', 'No relevant information found')}"
 
-    response = f"✅ **Found relevant information from:** {data.get('url', 'Unknown URL')}\n\n"
+    parts = [f"✅ **Found relevant information from:** {data.get('url', 'Unknown URL')}\n\n"]
 
     scraped_data = data.get('data', {})
     if isinstance(scraped_data, dict):
-        for key, value in scraped_data.items():
-            response += f"**{key.replace('_', ' ').title()}:**\n{value}\n\n"
+        parts.extend(f"**{key.replace('_', ' ').title()}:**\n{value}\n\n" for key, value in scraped_data.items())
     else:
-        response += str(scraped_data)
+        parts.append(str(scraped_data))
 
-    return response
+    return "".join(parts)
 
 
 if __name__ == "__main__":